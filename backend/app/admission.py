@@ -0,0 +1,304 @@
+"""
+Per-user admission control and load shedding for write-heavy routes.
+
+Each protected route belongs to a route class ("write", "import",
+"recompute"). A request
+is admitted only if:
+
+1. the class is below its global concurrency cap (else 503), and
+2. the user's token bucket for that class has a token (else 429).
+
+The cap is checked first so a request shed with 503 doesn't cost the user a
+token.
+
+Both rejections carry a `Retry-After` header. Limits are configured per
+class through environment variables, e.g. `ADMISSION_WRITE_RATE` (tokens per
+second), `ADMISSION_WRITE_BURST` and `ADMISSION_WRITE_CONCURRENCY`.
+
+State lives in a pluggable backend selected by `ADMISSION_BACKEND`:
+
+- `local` (default): in-process, per worker.
+- `file`: a JSON file shared by all workers on one host
+  (`ADMISSION_STATE_FILE`). POSIX only.
+- `package.module:factory`: any callable returning an `AdmissionBackend`,
+  e.g. a Redis-backed implementation for multi-host deployments.
+"""
+import importlib
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+
+from fastapi import Depends, HTTPException, status
+
+from .auth import CurrentUser, get_current_user
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "1").lower() not in ("0", "false", "no")
+
+# Concurrency slots held longer than this are assumed to belong to a crashed
+# worker and are reclaimed (only relevant for shared backends).
+SLOT_TTL_SECONDS = 300.0
+
+
+@dataclass(frozen=True)
+class AdmissionPolicy:
+    rate: float  # tokens refilled per second, per user
+    burst: int  # bucket capacity, per user
+    max_concurrent: int  # in-flight requests across all users
+
+
+def _policy(route_class: str, rate: float, burst: int, max_concurrent: int) -> AdmissionPolicy:
+    prefix = f"ADMISSION_{route_class.upper()}_"
+    return AdmissionPolicy(
+        rate=float(os.getenv(prefix + "RATE", rate)),
+        burst=int(os.getenv(prefix + "BURST", burst)),
+        max_concurrent=int(os.getenv(prefix + "CONCURRENCY", max_concurrent)),
+    )
+
+
+POLICIES = {
+    # Reviews, resets and problem edits: a quick flashcard session is well
+    # under this. Day and deck resets go through PUT /api/reviews/reset as one
+    # request.
+    "write": _policy("write", rate=5.0, burst=20, max_concurrent=16),
+    # Bulk imports: a couple per user, then one every 30 seconds.
+    "import": _policy("import", rate=1 / 30, burst=2, max_concurrent=2),
+    # Deck-wide recomputation: the work runs as a background job, so this
+    # only bounds how often a user can queue one.
+    "recompute": _policy("recompute", rate=1 / 60, burst=1, max_concurrent=4),
+}
+
+
+class AdmissionBackend:
+    """Interface for admission state storage."""
+
+    def take_token(self, key: str, rate: float, burst: int) -> float:
+        """Consume a token. Return 0 on success, else seconds until one is available."""
+        raise NotImplementedError
+
+    def acquire_slot(self, key: str, limit: int) -> Optional[str]:
+        """Reserve a concurrency slot. Return a slot id, or None if at the limit."""
+        raise NotImplementedError
+
+    def release_slot(self, key: str, slot_id: str) -> None:
+        """Release a slot returned by `acquire_slot`."""
+        raise NotImplementedError
+
+
+def _refill(tokens: float, updated: float, now: float, rate: float, burst: int) -> float:
+    return min(float(burst), tokens + (now - updated) * rate)
+
+
+def _take(bucket: Optional[list], now: float, rate: float, burst: int) -> tuple[list, float]:
+    """
+    Apply one take to a `[tokens, updated_at, full_at]` bucket.
+
+    Returns the new bucket and the wait in seconds (0 if a token was taken).
+    `full_at` is when the bucket will have refilled to `burst`; from then on
+    it is equivalent to a missing bucket and can be dropped (see `_prune`).
+    """
+    tokens = burst if bucket is None else _refill(bucket[0], bucket[1], now, rate, burst)
+    wait = 0.0
+    if tokens >= 1:
+        tokens -= 1
+    else:
+        # A zero rate never refills; ask clients to come back much later.
+        wait = (1 - tokens) / rate if rate > 0 else 3600.0
+    full_at = now + (burst - tokens) / rate if rate > 0 else float("inf")
+    return [tokens, now, full_at], wait
+
+
+def _prune(buckets: dict, now: float) -> None:
+    """Drop buckets that have refilled to capacity."""
+    for key in [
+        key for key, bucket in buckets.items() if len(bucket) < 3 or bucket[2] <= now
+    ]:
+        del buckets[key]
+
+
+class LocalBackend(AdmissionBackend):
+    """In-process state; limits apply per worker."""
+
+    # Full buckets are swept at most this often, keeping takes O(1).
+    PRUNE_INTERVAL_SECONDS = 60.0
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buckets: dict[str, list] = {}
+        self._slots: dict[str, set[str]] = {}
+        self._last_prune = time.monotonic()
+
+    def take_token(self, key: str, rate: float, burst: int) -> float:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_prune >= self.PRUNE_INTERVAL_SECONDS:
+                _prune(self._buckets, now)
+                self._last_prune = now
+            bucket, wait = _take(self._buckets.get(key), now, rate, burst)
+            self._buckets[key] = bucket
+            return wait
+
+    def acquire_slot(self, key: str, limit: int) -> Optional[str]:
+        with self._lock:
+            held = self._slots.setdefault(key, set())
+            if len(held) >= limit:
+                return None
+            slot_id = uuid.uuid4().hex
+            held.add(slot_id)
+            return slot_id
+
+    def release_slot(self, key: str, slot_id: str) -> None:
+        with self._lock:
+            self._slots.get(key, set()).discard(slot_id)
+
+
+class FileBackend(AdmissionBackend):
+    """
+    State in a JSON file guarded by an exclusive `flock`.
+
+    Shares limits between workers on one host, and doubles as a simple stand-in
+    for a networked backend in tests. Every call rewrites the file, so it
+    suits modest request rates only.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def _update(self, fn: Callable[[dict], object]) -> object:
+        import fcntl
+
+        with open(self.path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read()
+                state = json.loads(raw) if raw else {}
+                state.setdefault("buckets", {})
+                state.setdefault("slots", {})
+                result = fn(state)
+                f.seek(0)
+                f.truncate()
+                json.dump(state, f)
+                f.flush()
+                return result
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def take_token(self, key: str, rate: float, burst: int) -> float:
+        def apply(state: dict) -> float:
+            now = time.time()
+            # The whole file is rewritten anyway, so keep it to active users.
+            _prune(state["buckets"], now)
+            bucket, wait = _take(state["buckets"].get(key), now, rate, burst)
+            state["buckets"][key] = bucket
+            return wait
+
+        return self._update(apply)
+
+    def acquire_slot(self, key: str, limit: int) -> Optional[str]:
+        def apply(state: dict) -> Optional[str]:
+            now = time.time()
+            held = {
+                slot_id: acquired_at
+                for slot_id, acquired_at in state["slots"].get(key, {}).items()
+                if now - acquired_at < SLOT_TTL_SECONDS
+            }
+            slot_id = None
+            if len(held) < limit:
+                slot_id = uuid.uuid4().hex
+                held[slot_id] = now
+            state["slots"][key] = held
+            return slot_id
+
+        return self._update(apply)
+
+    def release_slot(self, key: str, slot_id: str) -> None:
+        self._update(lambda state: state["slots"].get(key, {}).pop(slot_id, None))
+
+
+def _backend_from_env() -> AdmissionBackend:
+    name = os.getenv("ADMISSION_BACKEND", "local")
+    if name == "local":
+        return LocalBackend()
+    if name == "file":
+        default_path = os.path.join(tempfile.gettempdir(), "algo-recall-admission.json")
+        return FileBackend(os.getenv("ADMISSION_STATE_FILE", default_path))
+    module_name, _, attr = name.partition(":")
+    if not attr:
+        raise ValueError(
+            "ADMISSION_BACKEND must be 'local', 'file' or 'package.module:factory'"
+        )
+    return getattr(importlib.import_module(module_name), attr)()
+
+
+_backend: Optional[AdmissionBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> AdmissionBackend:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _backend_from_env()
+    return _backend
+
+
+def set_backend(backend: AdmissionBackend) -> None:
+    """Replace the admission backend (e.g. in tests or custom deployments)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def _retry_after(seconds: float) -> dict:
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
+
+
+def admission(route_class: str) -> Callable[..., Iterator[CurrentUser]]:
+    """
+    Build a dependency that authenticates the user and applies the admission
+    policy for `route_class`. Use it in place of `get_current_user`.
+    """
+    policy = POLICIES[route_class]
+
+    def dependency(
+        current_user: CurrentUser = Depends(get_current_user),
+    ) -> Iterator[CurrentUser]:
+        if not ADMISSION_ENABLED:
+            yield current_user
+            return
+
+        backend = get_backend()
+        slot_id = backend.acquire_slot(route_class, policy.max_concurrent)
+        if slot_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, please retry",
+                headers=_retry_after(1),
+            )
+        try:
+            wait = backend.take_token(
+                f"{route_class}:{current_user.id}", policy.rate, policy.burst
+            )
+            if wait > 0:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many requests",
+                    headers=_retry_after(wait),
+                )
+            yield current_user
+        finally:
+            backend.release_slot(route_class, slot_id)
+
+    return dependency
+
+
+admit_write = admission("write")
+admit_import = admission("import")
+admit_recompute = admission("recompute")
@@ -0,0 +1,166 @@
+"""
+Review analytics rollups.
+
+All aggregation happens in SQL (GROUP BY over `review_history`, `problems`
+and `review_metadata`) so the cost scales with the number of groups returned,
+not with the size of a user's review history.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, func, select, true
+from sqlalchemy.orm import Session
+
+from . import models, schemas
+
+
+def _success_rate(remembered: int, total: int) -> float:
+    return float(remembered) / total * 100 if total else 0.0
+
+
+def _remembered_count():
+    return func.sum(case((models.ReviewHistory.result == "remembered", 1), else_=0))
+
+
+def _tag_values(db: Session):
+    """Table-valued expansion of `problems.tags` into one row per tag."""
+    if db.get_bind().dialect.name == "postgresql":
+        fn = (
+            func.jsonb_array_elements_text
+            if models.USE_POSTGRESQL
+            else func.json_array_elements_text
+        )
+        return fn(models.Problem.tags).table_valued("value").render_derived()
+    # SQLite's json_each exposes the array element as its `value` column.
+    return func.json_each(models.Problem.tags).table_valued("value")
+
+
+def _per_problem(user_id: str):
+    """
+    Review counts per problem for a user.
+
+    Served by an index-only scan of `ix_review_history_user_problem_result`;
+    the tag and difficulty rollups then join this (one row per problem)
+    instead of every review row.
+    """
+    return (
+        select(
+            models.ReviewHistory.problem_id,
+            func.count().label("total"),
+            _remembered_count().label("remembered"),
+        )
+        .where(models.ReviewHistory.user_id == user_id)
+        .group_by(models.ReviewHistory.problem_id)
+        .subquery()
+    )
+
+
+def _by_tag(db: Session, user_id: str) -> list[schemas.TagRollup]:
+    per_problem = _per_problem(user_id)
+    tag = _tag_values(db)
+    total = func.sum(per_problem.c.total)
+    rows = (
+        db.query(tag.c.value, total, func.sum(per_problem.c.remembered))
+        .select_from(per_problem)
+        .join(models.Problem, models.Problem.id == per_problem.c.problem_id)
+        .join(tag, true())
+        .group_by(tag.c.value)
+        .order_by(total.desc())
+        .all()
+    )
+    return [
+        schemas.TagRollup(
+            tag=name,
+            total_reviews=count,
+            remembered=remembered or 0,
+            success_rate=_success_rate(remembered or 0, count),
+        )
+        for name, count, remembered in rows
+    ]
+
+
+def _by_difficulty(db: Session, user_id: str) -> list[schemas.DifficultyRollup]:
+    per_problem = _per_problem(user_id)
+    rows = (
+        db.query(
+            models.Problem.difficulty,
+            func.sum(per_problem.c.total),
+            func.sum(per_problem.c.remembered),
+        )
+        .select_from(per_problem)
+        .join(models.Problem, models.Problem.id == per_problem.c.problem_id)
+        .group_by(models.Problem.difficulty)
+        .all()
+    )
+    return [
+        schemas.DifficultyRollup(
+            difficulty=difficulty,
+            total_reviews=count,
+            remembered=remembered or 0,
+            success_rate=_success_rate(remembered or 0, count),
+        )
+        for difficulty, count, remembered in rows
+    ]
+
+
+def _by_day(db: Session, user_id: str, days: int) -> list[schemas.DailyRollup]:
+    since = datetime.utcnow() - timedelta(days=days)
+    day = func.date(models.ReviewHistory.reviewed_at)
+    rows = (
+        db.query(day, func.count(), _remembered_count())
+        .filter(
+            models.ReviewHistory.user_id == user_id,
+            models.ReviewHistory.reviewed_at >= since,
+        )
+        .group_by(day)
+        .order_by(day)
+        .all()
+    )
+    # SQLite returns the day as a string, PostgreSQL as a date; str() gives
+    # an ISO date for both.
+    return [
+        schemas.DailyRollup(
+            day=str(value),
+            total_reviews=count,
+            remembered=remembered or 0,
+            success_rate=_success_rate(remembered or 0, count),
+        )
+        for value, count, remembered in rows
+    ]
+
+
+def _by_interval(db: Session, user_id: str) -> list[schemas.IntervalRollup]:
+    rows = (
+        db.query(
+            models.ReviewMetadata.interval_days,
+            func.count(models.ReviewMetadata.problem_id),
+            func.sum(models.ReviewMetadata.total_reviews),
+            func.sum(models.ReviewMetadata.times_remembered),
+        )
+        .join(models.Problem, models.Problem.id == models.ReviewMetadata.problem_id)
+        .filter(models.Problem.user_id == user_id)
+        .group_by(models.ReviewMetadata.interval_days)
+        .order_by(models.ReviewMetadata.interval_days)
+        .all()
+    )
+    return [
+        schemas.IntervalRollup(
+            interval_days=interval or 0,
+            problems=problems,
+            total_reviews=total or 0,
+            times_remembered=remembered or 0,
+            success_rate=_success_rate(remembered or 0, total or 0),
+        )
+        for interval, problems, total, remembered in rows
+    ]
+
+
+def compute_review_analytics(
+    db: Session, user_id: str, days: int
+) -> schemas.ReviewAnalytics:
+    """Compute all analytics rollups for a user."""
+    return schemas.ReviewAnalytics(
+        by_tag=_by_tag(db, user_id),
+        by_difficulty=_by_difficulty(db, user_id),
+        by_day=_by_day(db, user_id, days),
+        by_interval=_by_interval(db, user_id),
+    )
@@ -2,7 +2,6 @@ import os
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import JWTError, jwt
 from pydantic import BaseModel
 
 
@@ -23,6 +22,10 @@ def get_current_user(
     The frontend (Supabase client) will send `Authorization: Bearer <access_token>`.
     We verify it using the SUPABASE_JWT_SECRET and return a simple CurrentUser model.
     """
+    # Imported here so python-jose's cryptography backend is loaded on the
+    # first authenticated request rather than at app startup.
+    from jose import JWTError, jwt
+
     token = credentials.credentials
     secret = os.getenv("SUPABASE_JWT_SECRET")
     if not secret:
@@ -0,0 +1,83 @@
+"""
+Small in-process cache for per-user derived data.
+
+Every user has a monotonically increasing data version. Routes that write
+problems or reviews call `invalidate_user`, which bumps the version so any
+entry computed against an older version is treated as a miss. Entries are
+kept in an LRU bounded by count and by approximate size, so memory stays flat
+regardless of user count.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+MAX_ENTRIES = 1024
+MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+_lock = threading.Lock()
+_versions: dict[str, int] = {}
+# (namespace, user_id, key) -> (version, value, size)
+_entries: "OrderedDict[Tuple[str, str, Hashable], Tuple[int, Any, int]]" = OrderedDict()
+_total_bytes = 0
+
+
+def _evict(cache_key: Tuple[str, str, Hashable]) -> None:
+    global _total_bytes
+    _, _, size = _entries.pop(cache_key)
+    _total_bytes -= size
+
+
+def user_version(user_id: str) -> int:
+    """Return the current data version for a user."""
+    with _lock:
+        return _versions.get(user_id, 0)
+
+
+def invalidate_user(user_id: str) -> None:
+    """Mark all cached data for a user as stale."""
+    with _lock:
+        _versions[user_id] = _versions.get(user_id, 0) + 1
+
+
+def get_cached(namespace: str, user_id: str, key: Hashable = None) -> Optional[Any]:
+    """Return a cached value if it was computed against the current version."""
+    cache_key = (namespace, user_id, key)
+    with _lock:
+        entry = _entries.get(cache_key)
+        if entry is None:
+            return None
+        version, value, _ = entry
+        if version != _versions.get(user_id, 0):
+            _evict(cache_key)
+            return None
+        _entries.move_to_end(cache_key)
+        return value
+
+
+def set_cached(
+    namespace: str,
+    user_id: str,
+    value: Any,
+    version: int,
+    key: Hashable = None,
+    size: int = 0,
+) -> None:
+    """
+    Store a value computed against `version`.
+
+    Callers should read `user_version` before running their queries and pass
+    it here, so a write that lands mid-computation is never masked. `size` is
+    the approximate memory footprint in bytes, counted against MAX_BYTES.
+    """
+    global _total_bytes
+    cache_key = (namespace, user_id, key)
+    with _lock:
+        if version != _versions.get(user_id, 0) or size > MAX_BYTES:
+            return
+        if cache_key in _entries:
+            _evict(cache_key)
+        _entries[cache_key] = (version, value, size)
+        _total_bytes += size
+        while len(_entries) > MAX_ENTRIES or _total_bytes > MAX_BYTES:
+            _evict(next(iter(_entries)))
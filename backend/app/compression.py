@@ -0,0 +1,286 @@
+"""
+Negotiated response compression.
+
+`CompressionMiddleware` compresses responses with the best encoding the
+client accepts: zstd and brotli when their optional packages (`zstandard`,
+`brotli`) are installed, and gzip always. Small bodies, non-text content
+types and responses that already carry a Content-Encoding pass through
+unchanged. Streaming responses are compressed chunk by chunk and flushed so
+clients still receive data incrementally.
+
+`cached_json_response` serves hot read endpoints from per-user cached JSON
+bodies and keeps one precompressed copy per encoding next to them, so the
+same deck isn't serialized and recompressed on every fetch.
+"""
+import os
+import threading
+import zlib
+from typing import Callable, Hashable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+
+from . import cache
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+# Server preference when the client rates several encodings equally.
+AVAILABLE_ENCODINGS = tuple(
+    encoding
+    for encoding, available in (
+        ("zstd", zstandard is not None),
+        ("br", brotli is not None),
+        ("gzip", True),
+    )
+    if available
+)
+
+# Levels for per-request compression (cheap) and for cached bodies, which are
+# compressed once and served many times (denser).
+DYNAMIC_LEVELS = {"gzip": 5, "br": 4, "zstd": 3}
+STATIC_LEVELS = {"gzip": 9, "br": 9, "zstd": 12}
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Pick the best available encoding for an Accept-Encoding header."""
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[token.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in AVAILABLE_ENCODINGS:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(encoding: str, data: bytes, level: Optional[int] = None) -> bytes:
+    """Compress a complete body."""
+    level = DYNAMIC_LEVELS[encoding] if level is None else level
+    if encoding == "gzip":
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    raise ValueError(f"Unsupported encoding {encoding!r}")
+
+
+class _StreamEncoder:
+    """Incremental compressor that flushes after every chunk."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        level = DYNAMIC_LEVELS[encoding]
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        elif encoding == "br":
+            self._compressor = brotli.Compressor(quality=level)
+        else:
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "gzip":
+            return self._compressor.compress(data) + self._compressor.flush(
+                zlib.Z_SYNC_FLUSH
+            )
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def _is_compressible(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """ASGI middleware applying negotiated gzip/brotli/zstd compression."""
+
+    def __init__(self, app, minimum_size: int = MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        # Even when nothing is negotiated the responder runs, so compressible
+        # responses always carry `Vary: Accept-Encoding` for shared caches.
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        responder = _CompressionResponder(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder)
+
+
+class _CompressionResponder:
+    def __init__(self, send, encoding: Optional[str], minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message = None
+        self.encoder: Optional[_StreamEncoder] = None
+        self.passthrough = False
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            # Hold the headers until the first body chunk shows whether and
+            # how to compress.
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            await self._start(start, body, more_body)
+            return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+        data = self.encoder.chunk(body) if body else b""
+        if not more_body:
+            data += self.encoder.finish()
+        await self.send(
+            {"type": "http.response.body", "body": data, "more_body": more_body}
+        )
+
+    async def _start(self, start, body: bytes, more_body: bool) -> None:
+        headers = MutableHeaders(raw=start["headers"])
+        compressible = _is_compressible(headers.get("content-type"))
+        if compressible and "accept-encoding" not in headers.get("vary", "").lower():
+            headers.add_vary_header("Accept-Encoding")
+
+        if (
+            self.encoding is None
+            or not compressible
+            or "content-encoding" in headers
+            or start["status"] in (204, 206, 304)
+            or (not more_body and len(body) < self.minimum_size)
+        ):
+            self.passthrough = True
+            await self.send(start)
+            await self.send(
+                {"type": "http.response.body", "body": body, "more_body": more_body}
+            )
+            return
+
+        headers["Content-Encoding"] = self.encoding
+        if not more_body:
+            data = compress(self.encoding, body)
+            headers["Content-Length"] = str(len(data))
+            await self.send(start)
+            await self.send({"type": "http.response.body", "body": data})
+            return
+
+        # Streaming: length is unknown up front.
+        if "content-length" in headers:
+            del headers["Content-Length"]
+        self.encoder = _StreamEncoder(self.encoding)
+        await self.send(start)
+        await self.send(
+            {
+                "type": "http.response.body",
+                "body": self.encoder.chunk(body) if body else b"",
+                "more_body": True,
+            }
+        )
+
+
+class _CachedBody:
+    """
+    A JSON body plus lazily built precompressed variants.
+
+    Variants are built under a per-body lock, so concurrent first hits for
+    the same encoding wait for one compression instead of each running it.
+    """
+
+    __slots__ = ("identity", "encoded", "_lock")
+
+    def __init__(self, identity: bytes):
+        self.identity = identity
+        self.encoded: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def get(self, encoding: str) -> bytes:
+        data = self.encoded.get(encoding)
+        if data is not None:
+            return data
+        with self._lock:
+            data = self.encoded.get(encoding)
+            if data is None:
+                data = compress(encoding, self.identity, STATIC_LEVELS[encoding])
+                self.encoded[encoding] = data
+        return data
+
+
+def cached_json_response(
+    request: Request,
+    namespace: str,
+    user_id: str,
+    key: Hashable,
+    build: Callable[[], bytes],
+) -> Response:
+    """
+    Serve a JSON body from the per-user cache, precompressed if negotiated.
+
+    `build` returns the serialized JSON and only runs on a cache miss. The
+    entry is dropped on the user's next write (see `cache.invalidate_user`);
+    callers should include anything else the body depends on in `key`.
+    """
+    version = cache.user_version(user_id)
+    entry = cache.get_cached(namespace, user_id, key)
+    if entry is None:
+        entry = _CachedBody(build())
+        # Budget for the identity body plus roughly one compressed copy.
+        size = len(entry.identity) * 2
+        cache.set_cached(namespace, user_id, entry, version, key=key, size=size)
+
+    headers = {"Vary": "Accept-Encoding"}
+    encoding = negotiate(request.headers.get("accept-encoding", ""))
+    if encoding is None or len(entry.identity) < MIN_SIZE:
+        return Response(entry.identity, media_type="application/json", headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(entry.get(encoding), media_type="application/json", headers=headers)
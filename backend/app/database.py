@@ -1,16 +1,25 @@
 import os
+import threading
 from pathlib import Path
 
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import declarative_base, sessionmaker
-from dotenv import load_dotenv
 
 # Support both SQLite (local dev) and PostgreSQL (production)
 BASE_DIR = Path(__file__).resolve().parent.parent
 DB_PATH = BASE_DIR / "flashcards.db"
 
-# Load environment variables from a local .env file (useful for local dev)
-load_dotenv()
+# Cold-start optimized mode for serverless deployments: skip .env loading,
+# import routers lazily and run no schema DDL at boot (see app.main).
+# Must be set in the real environment, not in .env.
+FAST_COLD_START = os.getenv("FAST_COLD_START", "").lower() in ("1", "true", "yes")
+
+if not FAST_COLD_START:
+    from dotenv import load_dotenv
+
+    # Load environment variables from a local .env file (useful for local dev)
+    load_dotenv()
 
 # Use DATABASE_URL if set (for production), otherwise use SQLite (for local dev)
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -29,19 +38,40 @@ else:
     SQLALCHEMY_DATABASE_URL = f"sqlite:///{DB_PATH}"
     connect_args = {"check_same_thread": False}
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args=connect_args, pool_pre_ping=True
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# The engine (and with it the DB driver import) is created on first use
+# rather than at import time.
+_engine: Engine | None = None
+_engine_lock = threading.Lock()
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
 Base = declarative_base()
 
 
+def get_engine() -> Engine:
+    """Return the shared engine, creating it on first call."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(
+                    SQLALCHEMY_DATABASE_URL,
+                    connect_args=connect_args,
+                    pool_pre_ping=True,
+                )
+    return _engine
+
+
+def current_engine() -> Engine | None:
+    """Return the engine if it has been created, without creating it."""
+    return _engine
+
+
 def init_db() -> None:
     """Create all database tables."""
     from . import models  # noqa: F401
 
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
 
 
 def ensure_user_columns() -> None:
@@ -51,6 +81,7 @@ def ensure_user_columns() -> None:
     This runs lightweight ALTER TABLE statements that are safe to execute
     multiple times thanks to IF NOT EXISTS.
     """
+    engine = get_engine()
     with engine.begin() as conn:
         backend = engine.url.get_backend_name()
 
@@ -83,12 +114,40 @@ def ensure_user_columns() -> None:
             )
 
 
+def ensure_indexes() -> None:
+    """
+    Ensure composite indexes exist on tables created before they were added.
+
+    `create_all` only creates indexes alongside new tables, so existing
+    databases get them here. IF NOT EXISTS works on SQLite and PostgreSQL.
+    """
+    with get_engine().begin() as conn:
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_review_history_user_reviewed_result "
+                "ON review_history (user_id, reviewed_at, result)"
+            )
+        )
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_review_history_user_problem_result "
+                "ON review_history (user_id, problem_id, result, reviewed_at)"
+            )
+        )
+
+
+def bootstrap_schema() -> None:
+    """Create tables, per-user columns and indexes."""
+    init_db()
+    ensure_user_columns()
+    ensure_indexes()
+
+
 def get_db():
     """FastAPI dependency to get a DB session."""
-    db = SessionLocal()
+    db = SessionLocal(bind=get_engine())
     try:
         yield db
     finally:
         db.close()
 
-
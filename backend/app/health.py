@@ -1,27 +1,170 @@
-"""Health check endpoint for monitoring."""
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+"""
+Health check endpoints for monitoring.
+
+- `/health/live`: liveness. Never touches the database; answers 200 as long
+  as the process can serve requests.
+- `/health/ready` (and `/health`): readiness. Answers 503 until startup has
+  finished and while the last database check is failing.
+
+The database check runs at most once per `HEALTH_DB_CHECK_TTL` seconds in a
+background thread. Probes only read the cached result, so load-balancer
+polling doesn't take pooled connections away from real requests. A check that
+has been running for more than three TTLs is reported as `stale` (not ready),
+however recently the previous check succeeded.
+"""
+import os
+import threading
+import time
+
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
 from sqlalchemy import text
 
-from .database import get_db
+from .database import current_engine, get_engine
 
 router = APIRouter()
 
+DB_CHECK_TTL_SECONDS = float(os.getenv("HEALTH_DB_CHECK_TTL", "10"))
+# A check running longer than this is hung (e.g. waiting on an exhausted pool
+# or a connect that never completes): report not ready.
+DB_CHECK_MAX_AGE_SECONDS = 3 * DB_CHECK_TTL_SECONDS
 
-@router.get("/health")
-def health_check(db: Session = Depends(get_db)):
-    """Health check endpoint for load balancers and monitoring."""
+_lock = threading.Lock()
+_startup = {"complete": False, "started_at": None}
+_db_check = {
+    "ok": None,  # None = not checked yet
+    "error": None,
+    "checked_at": 0.0,
+    "latency_ms": None,
+    "started_at": None,  # set while a check is in flight
+}
+
+
+def mark_started(prime_db_check: bool = True) -> None:
+    """
+    Record that application startup has finished.
+
+    With `prime_db_check` the first DB check starts right away; otherwise it
+    waits for the first readiness probe.
+    """
+    with _lock:
+        _startup["complete"] = True
+        _startup["started_at"] = time.time()
+    if prime_db_check:
+        _schedule_db_check(force=True)
+
+
+def _run_db_check() -> None:
+    started = time.monotonic()
     try:
-        # Simple database connectivity check
-        db.execute(text("SELECT 1"))
-        return {
-            "status": "healthy",
-            "database": "connected"
-        }
+        with get_engine().connect() as conn:
+            conn.execute(text("SELECT 1"))
+        ok, error = True, None
     except Exception as e:
-        return {
-            "status": "unhealthy",
-            "database": "disconnected",
-            "error": str(e)
-        }, 503
+        ok, error = False, str(e)
+    with _lock:
+        _db_check.update(
+            ok=ok,
+            error=error,
+            checked_at=time.time(),
+            latency_ms=round((time.monotonic() - started) * 1000, 2),
+            started_at=None,
+        )
+
+
+def _schedule_db_check(force: bool = False) -> None:
+    """Start a background DB check if the cached result is stale."""
+    with _lock:
+        if _db_check["started_at"] is not None:
+            return
+        now = time.time()
+        if not force and now - _db_check["checked_at"] < DB_CHECK_TTL_SECONDS:
+            return
+        _db_check["started_at"] = now
+    threading.Thread(target=_run_db_check, name="health-db-check", daemon=True).start()
+
+
+def _pool_stats() -> dict:
+    """Connection pool utilization (fields are omitted if the pool lacks them)."""
+    engine = current_engine()
+    if engine is None:
+        # Engine creation is deferred until first use; don't force it here.
+        return {"created": False}
+    pool = engine.pool
+    stats = {"class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        fn = getattr(pool, name, None)
+        if callable(fn):
+            stats[name] = fn()
+    # QueuePool exposes no public accessor for its overflow limit; a negative
+    # value means unbounded, in which case there is no meaningful ratio.
+    max_overflow = getattr(pool, "_max_overflow", None)
+    if stats.get("size") and max_overflow is not None and max_overflow >= 0:
+        stats["capacity"] = stats["size"] + max_overflow
+        stats["utilization"] = round(
+            stats.get("checkedout", 0) / stats["capacity"], 3
+        )
+    return stats
+
+
+def _startup_state() -> dict:
+    return {
+        "complete": _startup["complete"],
+        "uptime_seconds": (
+            round(time.time() - _startup["started_at"], 1)
+            if _startup["started_at"]
+            else None
+        ),
+    }
+
+
+@router.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up. Does not touch the database."""
+    with _lock:
+        startup = _startup_state()
+    return {"status": "alive", "startup": startup, "pool": _pool_stats()}
+
+
+@router.get("/health")
+@router.get("/health/ready")
+async def readiness():
+    """Readiness probe for load balancers, backed by a cached DB check."""
+    _schedule_db_check()
+    with _lock:
+        startup = _startup_state()
+        check = dict(_db_check)
+
+    now = time.time()
+    age = now - check["checked_at"] if check["checked_at"] else None
+    # Judge staleness by how long the in-flight check has run, not by the
+    # age of the last result: with probes spaced further apart than the TTL,
+    # every probe reads a result from the previous probe's check.
+    hung = (
+        check["started_at"] is not None
+        and now - check["started_at"] > DB_CHECK_MAX_AGE_SECONDS
+    )
+    if hung:
+        database = "stale"
+    elif check["ok"] is None:
+        database = "unknown"
+    else:
+        database = "connected" if check["ok"] else "disconnected"
+    ready = startup["complete"] and database == "connected"
 
+    body = {
+        "status": "healthy" if ready else "unhealthy",
+        "database": database,
+        "startup": startup,
+        "pool": _pool_stats(),
+        "db_check": {
+            "age_seconds": round(age, 1) if age is not None else None,
+            "latency_ms": check["latency_ms"],
+        },
+    }
+    if check["error"]:
+        body["error"] = check["error"]
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=body,
+    )
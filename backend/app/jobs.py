@@ -0,0 +1,415 @@
+"""
+Lightweight in-process background jobs backed by the `jobs` table.
+
+Heavy endpoints call `submit`, which records a queued job and returns it
+immediately; the work runs on a small thread pool (`JOB_WORKERS`) with its
+own DB session, so request latency doesn't depend on how much work is queued.
+
+Handlers are registered with `@handler(kind)` and receive a `JobContext`.
+They process work in batches and call `ctx.checkpoint(...)`, which commits the
+batch together with the job's cursor and progress. After a crash the job is
+claimed again (see `resume_stale_jobs`, run at startup and then periodically
+by `start_sweeper`) and the handler continues from `ctx.cursor`, so each
+batch is applied exactly once.
+
+Every claim increments `attempts`, which doubles as a fencing token: a
+checkpoint only commits while the job is still held by the same attempt, so
+a runner whose job was reclaimed (e.g. after stalling past
+`JOB_STALE_SECONDS`) rolls back its batch and stops. While a handler runs, a
+heartbeat thread keeps `updated_at` fresh so slow batches aren't reclaimed.
+
+A thread pool is used rather than a process pool: jobs are database-bound and
+need SQLAlchemy sessions, which don't cross process boundaries.
+"""
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import cache, models
+from .database import SessionLocal, get_engine
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# A running job whose heartbeat is older than this is considered orphaned.
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "120"))
+# Jobs that keep crashing their worker are failed after this many claims.
+MAX_ATTEMPTS = 3
+
+ACTIVE_STATUSES = ("queued", "running")
+
+_HANDLERS: dict[str, Callable[..., Any]] = {}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_sweeper_stop: Optional[threading.Event] = None
+
+
+class JobLost(Exception):
+    """Raised in a runner whose job has been claimed by another attempt."""
+
+
+class JobContext:
+    """Progress and checkpoint API passed to job handlers."""
+
+    def __init__(self, db: Session, job: models.Job, attempt: int):
+        self.db = db
+        self.job = job
+        self.attempt = attempt
+
+    @property
+    def cursor(self) -> Optional[int]:
+        return self.job.cursor
+
+    @property
+    def payload(self) -> Any:
+        return self.job.payload
+
+    def checkpoint(
+        self, cursor: Optional[int], progress: int, total: Optional[int] = None
+    ) -> None:
+        """
+        Commit pending work together with the new cursor and progress.
+
+        Raises `JobLost` (after rolling the batch back) if another attempt has
+        claimed the job since this runner did.
+        """
+        fields = {
+            models.Job.cursor: cursor,
+            models.Job.progress: progress,
+            models.Job.updated_at: datetime.utcnow(),
+        }
+        if total is not None:
+            fields[models.Job.total] = total
+        user_id = self.job.user_id
+        if not _update_owned(self.db, self.job.id, self.attempt, fields):
+            self.db.rollback()
+            raise JobLost(self.job.id)
+        self.db.commit()
+        cache.invalidate_user(user_id)
+
+
+def handler(kind: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Register `fn(ctx: JobContext) -> result` as the handler for `kind`."""
+
+    def register(fn: Callable[..., Any]) -> Callable[..., Any]:
+        _HANDLERS[kind] = fn
+        return fn
+
+    return register
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=JOB_WORKERS, thread_name_prefix="job"
+                )
+    return _executor
+
+
+def shutdown() -> None:
+    """Stop accepting jobs. Interrupted jobs are resumed once they go stale."""
+    global _executor, _sweeper_stop
+    with _executor_lock:
+        if _sweeper_stop is not None:
+            _sweeper_stop.set()
+            _sweeper_stop = None
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _is_stale(job: models.Job, now: datetime) -> bool:
+    return job.updated_at is None or job.updated_at < now - timedelta(
+        seconds=JOB_STALE_SECONDS
+    )
+
+
+def submit(
+    db: Session,
+    user_id: str,
+    kind: str,
+    payload: Any = None,
+    total: Optional[int] = None,
+    idempotency_key: Optional[str] = None,
+    single_active: bool = False,
+) -> models.Job:
+    """
+    Record a queued job and schedule it.
+
+    With `idempotency_key`, resubmitting returns the existing job. With
+    `single_active`, an already queued/running job of the same kind for this
+    user is returned instead of starting another.
+    """
+    if kind not in _HANDLERS:
+        raise ValueError(f"No handler registered for job kind {kind!r}")
+
+    existing = None
+    if idempotency_key is not None:
+        existing = (
+            db.query(models.Job)
+            .filter(
+                models.Job.user_id == user_id,
+                models.Job.kind == kind,
+                models.Job.idempotency_key == idempotency_key,
+            )
+            .first()
+        )
+    elif single_active:
+        existing = (
+            db.query(models.Job)
+            .filter(
+                models.Job.user_id == user_id,
+                models.Job.kind == kind,
+                models.Job.status.in_(ACTIVE_STATUSES),
+            )
+            .first()
+        )
+    if existing:
+        return existing
+
+    job = models.Job(
+        id=uuid.uuid4().hex,
+        user_id=user_id,
+        kind=kind,
+        status="queued",
+        idempotency_key=idempotency_key,
+        payload=payload,
+        total=total,
+        progress=0,
+        attempts=0,
+    )
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent submit using the same key.
+        db.rollback()
+        return (
+            db.query(models.Job)
+            .filter(
+                models.Job.user_id == user_id,
+                models.Job.kind == kind,
+                models.Job.idempotency_key == idempotency_key,
+            )
+            .one()
+        )
+    db.refresh(job)
+    enqueue(job.id)
+    return job
+
+
+def enqueue(job_id: str) -> None:
+    """Schedule a job to run; a no-op if another worker already holds it."""
+    # Processes that never ran startup (FAST_COLD_START) sweep from their
+    # first job on.
+    start_sweeper()
+    _get_executor().submit(_run, job_id)
+
+
+def _update_owned(db: Session, job_id: str, attempt: int, fields: dict) -> bool:
+    """Update a running job only if `attempt` still holds it (not committed)."""
+    updated = (
+        db.query(models.Job)
+        .filter(
+            models.Job.id == job_id,
+            models.Job.attempts == attempt,
+            models.Job.status == "running",
+        )
+        .update(fields, synchronize_session=False)
+    )
+    return updated == 1
+
+
+def _heartbeat(job_id: str, attempt: int, stop: threading.Event) -> None:
+    """Keep a running job's `updated_at` fresh until `stop` is set."""
+    interval = JOB_STALE_SECONDS / 4
+    while not stop.wait(interval):
+        db = SessionLocal(bind=get_engine())
+        try:
+            if not _update_owned(
+                db, job_id, attempt, {models.Job.updated_at: datetime.utcnow()}
+            ):
+                return
+            db.commit()
+        except Exception:
+            # e.g. SQLite busy while the handler holds the write lock; the
+            # next beat or checkpoint refreshes the heartbeat instead.
+            logger.warning("Heartbeat for job %s failed", job_id, exc_info=True)
+            db.rollback()
+        finally:
+            db.close()
+
+
+def _claim(db: Session, job_id: str) -> Optional[int]:
+    """
+    Atomically move a queued or orphaned job to running.
+
+    Returns the claiming attempt number, or None if the job isn't claimable.
+    """
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=JOB_STALE_SECONDS)
+    claimed = (
+        db.query(models.Job)
+        .filter(
+            models.Job.id == job_id,
+            models.Job.attempts < MAX_ATTEMPTS,
+            or_(
+                models.Job.status == "queued",
+                and_(
+                    models.Job.status == "running",
+                    models.Job.updated_at < stale_before,
+                ),
+            ),
+        )
+        .update(
+            {
+                models.Job.status: "running",
+                models.Job.updated_at: now,
+                models.Job.attempts: models.Job.attempts + 1,
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    if claimed != 1:
+        return None
+    return db.query(models.Job.attempts).filter(models.Job.id == job_id).scalar()
+
+
+def _finish(db: Session, job_id: str, attempt: Optional[int] = None, **fields: Any) -> None:
+    """Record a final status; with `attempt`, only if that attempt still holds the job."""
+    job = db.get(models.Job, job_id)
+    if attempt is not None and (job.attempts != attempt or job.status != "running"):
+        return
+    now = datetime.utcnow()
+    for field, value in fields.items():
+        setattr(job, field, value)
+    job.updated_at = now
+    job.finished_at = now
+    db.commit()
+    cache.invalidate_user(job.user_id)
+
+
+def _run(job_id: str) -> None:
+    db = SessionLocal(bind=get_engine())
+    try:
+        attempt = _claim(db, job_id)
+        if attempt is None:
+            return
+        job = db.get(models.Job, job_id)
+        run_handler = _HANDLERS.get(job.kind)
+        if run_handler is None:
+            _finish(
+                db, job_id, attempt, status="failed", error=f"Unknown job kind {job.kind!r}"
+            )
+            return
+
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=_heartbeat, args=(job_id, attempt, stop), daemon=True
+        )
+        heartbeat.start()
+        try:
+            result = run_handler(JobContext(db, job, attempt))
+        except JobLost:
+            logger.warning("Job %s was reclaimed; abandoning attempt %s", job_id, attempt)
+            return
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job_id, job.kind)
+            db.rollback()
+            _finish(db, job_id, attempt, status="failed", error=str(e))
+            return
+        finally:
+            stop.set()
+
+        _finish(
+            db,
+            job_id,
+            attempt,
+            status="succeeded",
+            result=result,
+            progress=job.total if job.total is not None else job.progress,
+            error=None,
+        )
+    finally:
+        db.close()
+
+
+def resume_if_stale(db: Session, job: models.Job) -> None:
+    """Re-schedule a job whose worker appears to have died."""
+    if job.status not in ACTIVE_STATUSES or not _is_stale(job, datetime.utcnow()):
+        return
+    if (job.attempts or 0) >= MAX_ATTEMPTS:
+        _finish(db, job.id, status="failed", error="Job exceeded maximum attempts")
+        db.refresh(job)
+        return
+    if job.kind in _HANDLERS:
+        enqueue(job.id)
+
+
+def resume_stale_jobs(include_queued: bool = True) -> None:
+    """
+    Schedule orphaned jobs, and with `include_queued` every queued job.
+
+    At startup all queued jobs are scheduled, since none of them are in this
+    process's executor yet. Periodic sweeps pass `include_queued=False` and
+    only pick up jobs whose heartbeat has gone stale.
+    """
+    db = SessionLocal(bind=get_engine())
+    try:
+        pending = (
+            db.query(models.Job)
+            .filter(models.Job.status.in_(ACTIVE_STATUSES))
+            .order_by(models.Job.created_at)
+            .all()
+        )
+        for job in pending:
+            if include_queued and job.status == "queued" and job.kind in _HANDLERS:
+                # Claiming is atomic, so a job another worker also picked up
+                # still runs only once.
+                enqueue(job.id)
+            else:
+                resume_if_stale(db, job)
+    finally:
+        db.close()
+
+
+def _sweep(stop: threading.Event, interval: float) -> None:
+    while not stop.wait(interval):
+        try:
+            resume_stale_jobs(include_queued=False)
+        except Exception:
+            logger.warning("Stale job sweep failed", exc_info=True)
+
+
+def start_sweeper() -> None:
+    """
+    Periodically resume jobs orphaned by a crash or restart.
+
+    A job that was running when the previous process stopped still has a
+    fresh heartbeat at startup; sweeping every `JOB_STALE_SECONDS / 2` picks
+    it up within 1.5x `JOB_STALE_SECONDS` of the restart. Stopped by `shutdown`.
+    """
+    global _sweeper_stop
+    with _executor_lock:
+        if _sweeper_stop is not None:
+            return
+        _sweeper_stop = threading.Event()
+        threading.Thread(
+            target=_sweep,
+            args=(_sweeper_stop, JOB_STALE_SECONDS / 2),
+            name="job-sweeper",
+            daemon=True,
+        ).start()
@@ -1,12 +1,52 @@
+import importlib
 import os
+import threading
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from . import models  # noqa: F401  # imported for side-effects (SQLAlchemy models)
-from .database import init_db, ensure_user_columns, DATABASE_URL
-from .routers import problems, reviews, import_routes
-from .health import router as health_router
+from .compression import CompressionMiddleware
+from .database import FAST_COLD_START, bootstrap_schema
+from .health import mark_started, router as health_router
+
+# (module, URL prefix, OpenAPI tag) for each API router.
+API_ROUTERS = [
+    ("problems", "/api/problems", "problems"),
+    ("reviews", "/api/reviews", "reviews"),
+    ("import_routes", "/api/import", "import"),
+    ("job_routes", "/api/jobs", "jobs"),
+]
+
+
+class LazyRouterApp:
+    """
+    ASGI app that imports a router module on its first request.
+
+    Used in FAST_COLD_START mode so a cold instance only pays for the routers
+    (and their models/schemas/auth imports) that it actually serves. Routes
+    mounted this way are not listed in the OpenAPI schema.
+    """
+
+    def __init__(self, module: str, tag: str):
+        self.module = module
+        self.tag = tag
+        self._app: FastAPI | None = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> FastAPI:
+        if self._app is None:
+            with self._lock:
+                if self._app is None:
+                    router_module = importlib.import_module(
+                        f".routers.{self.module}", package=__package__
+                    )
+                    sub_app = FastAPI(openapi_url=None, docs_url=None, redoc_url=None)
+                    sub_app.include_router(router_module.router, tags=[self.tag])
+                    self._app = sub_app
+        return self._app
+
+    async def __call__(self, scope, receive, send):
+        await self._load()(scope, receive, send)
 
 
 def create_app() -> FastAPI:
@@ -46,25 +86,53 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    # Negotiated gzip/brotli/zstd; responses that are already precompressed
+    # (see compression.cached_json_response) pass through untouched.
+    app.add_middleware(CompressionMiddleware)
 
     # Include routers
     app.include_router(health_router)  # Health check (no prefix)
-    app.include_router(problems.router, prefix="/api/problems", tags=["problems"])
-    app.include_router(reviews.router, prefix="/api/reviews", tags=["reviews"])
-    app.include_router(import_routes.router, prefix="/api/import", tags=["import"])
+    for module, prefix, tag in API_ROUTERS:
+        if FAST_COLD_START:
+            app.mount(prefix, LazyRouterApp(module, tag))
+        else:
+            router_module = importlib.import_module(
+                f".routers.{module}", package=__package__
+            )
+            app.include_router(router_module.router, prefix=prefix, tags=[tag])
 
     @app.on_event("startup")
     async def on_startup() -> None:  # pragma: no cover - simple bootstrap
-        # Always ensure tables exist
-        init_db()
-        # Ensure per-user columns exist
-        ensure_user_columns()
+        if FAST_COLD_START:
+            # No DDL and no DB connection at boot: the schema is managed out of
+            # band (run `bootstrap_schema()` once per deploy) and the engine is
+            # created by the first request that needs it. Interrupted jobs are
+            # resumed once this instance schedules a job (see jobs.enqueue) or
+            # through POST /api/jobs/{id}/resume.
+            mark_started(prime_db_check=False)
+            return
+
+        # Always ensure tables exist, per-user columns and composite indexes
+        bootstrap_schema()
+        # Pick up jobs interrupted by a previous shutdown or crash, now and
+        # once the heartbeats of jobs that were running go stale
+        from .jobs import resume_stale_jobs, start_sweeper
+
+        resume_stale_jobs()
+        start_sweeper()
+        # Readiness probes report healthy only after bootstrap completes
+        mark_started()
 
         # Note: Problem seeding is now handled by database trigger in Supabase.
         # The trigger automatically seeds 150 problems for new users when they sign up.
 
+    @app.on_event("shutdown")
+    async def on_shutdown() -> None:  # pragma: no cover - simple teardown
+        from .jobs import shutdown as shutdown_jobs
+
+        shutdown_jobs()
+
     return app
 
 
 app = create_app()
-
@@ -1,17 +1,28 @@
 import os
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.dialects.sqlite import JSON as SQLiteJSON
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import relationship
 
 from .database import Base
 
 # Use JSONB for PostgreSQL, JSON for SQLite
-# Check if we're using PostgreSQL (DATABASE_URL contains postgresql)
+# Check if we're using PostgreSQL (DATABASE_URL contains postgresql).
+# Only the dialect in use is imported to keep startup cheap.
 USE_POSTGRESQL = os.getenv("DATABASE_URL", "").startswith("postgresql")
-JSON_COLUMN = JSONB if USE_POSTGRESQL else SQLiteJSON
+if USE_POSTGRESQL:
+    from sqlalchemy.dialects.postgresql import JSONB as JSON_COLUMN
+else:
+    from sqlalchemy.dialects.sqlite import JSON as JSON_COLUMN
 
 
 class Problem(Base):
@@ -43,6 +54,23 @@ class Problem(Base):
 
 class ReviewHistory(Base):
     __tablename__ = "review_history"
+    # Covering indexes for per-user scans by time (stats, daily rollups) and
+    # by problem (tag/difficulty rollups), so analytics never touch the table.
+    __table_args__ = (
+        Index(
+            "ix_review_history_user_reviewed_result",
+            "user_id",
+            "reviewed_at",
+            "result",
+        ),
+        Index(
+            "ix_review_history_user_problem_result",
+            "user_id",
+            "problem_id",
+            "result",
+            "reviewed_at",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     # Supabase auth user id (UUID as string)
@@ -90,3 +118,30 @@ class ProblemTemplate(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+class Job(Base):
+    """Background job (imports, deck-wide recomputation) run by app.jobs."""
+    __tablename__ = "jobs"
+    # Resubmitting with the same Idempotency-Key returns the existing job.
+    __table_args__ = (
+        UniqueConstraint("user_id", "kind", "idempotency_key"),
+    )
+
+    id = Column(String, primary_key=True)  # uuid4 hex
+    # Supabase auth user id (UUID as string)
+    user_id = Column(String, index=True, nullable=False)
+    kind = Column(String, nullable=False, index=True)
+    # queued / running / succeeded / failed
+    status = Column(String, nullable=False, default="queued", index=True)
+    idempotency_key = Column(String, nullable=True)
+    payload = Column(JSON_COLUMN, nullable=True)
+    result = Column(JSON_COLUMN, nullable=True)
+    error = Column(Text, nullable=True)
+    progress = Column(Integer, default=0)
+    total = Column(Integer, nullable=True)
+    # Handler-defined resume point, committed together with each batch of work
+    cursor = Column(Integer, nullable=True)
+    attempts = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    # Doubles as the heartbeat used to detect jobs orphaned by a crash
+    updated_at = Column(DateTime, default=datetime.utcnow, index=True)
+    finished_at = Column(DateTime, nullable=True)
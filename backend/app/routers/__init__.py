@@ -1,3 +1,6 @@
-from . import problems, reviews, import_routes  # noqa: F401
-
+"""
+API routers for problems, reviews, and imports.
 
+Router modules are imported by `app.main` on demand rather than here, so
+that cold-start mode can defer loading them until their first request.
+"""
@@ -1,32 +1,50 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header
 from sqlalchemy.orm import Session
 
-from .. import models, schemas
-from ..auth import CurrentUser, get_current_user
+from .. import jobs, models, schemas
+from ..admission import admit_import
+from ..auth import CurrentUser
 from ..database import get_db
 
 router = APIRouter()
 
+IMPORT_BATCH_SIZE = 25
 
-@router.post("/neetcode150", response_model=List[schemas.Problem])
+
+@jobs.handler("import_neetcode150")
+def run_import(ctx: jobs.JobContext) -> dict:
+    """Insert the queued problems in batches, resuming after the last batch."""
+    problems = ctx.payload["problems"]
+    start = ctx.cursor or 0
+    for offset in range(start, len(problems), IMPORT_BATCH_SIZE):
+        batch = problems[offset : offset + IMPORT_BATCH_SIZE]
+        for data in batch:
+            ctx.db.add(models.Problem(**data, user_id=ctx.job.user_id))
+        done = offset + len(batch)
+        ctx.checkpoint(cursor=done, progress=done)
+    return {"imported": len(problems)}
+
+
+@router.post("/neetcode150", response_model=schemas.Job, status_code=202)
 def import_neetcode150(
     problems: List[schemas.ProblemCreate],
     db: Session = Depends(get_db),
-    current_user: CurrentUser = Depends(get_current_user),
+    current_user: CurrentUser = Depends(admit_import),
+    idempotency_key: Optional[str] = Header(None),
 ):
-    created: List[models.Problem] = []
-    for payload in problems:
-        problem = models.Problem(
-            **payload.model_dump(),
-            user_id=current_user.id,
-        )
-        db.add(problem)
-        created.append(problem)
-    db.commit()
-    for p in created:
-        db.refresh(p)
-    return created
-
+    """
+    Queue an import and return the job right away.
 
+    Poll `GET /api/jobs/{id}` for progress. Resending with the same
+    `Idempotency-Key` header returns the original job instead of importing twice.
+    """
+    return jobs.submit(
+        db,
+        current_user.id,
+        "import_neetcode150",
+        payload={"problems": [p.model_dump() for p in problems]},
+        total=len(problems),
+        idempotency_key=idempotency_key,
+    )
@@ -0,0 +1,65 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from .. import jobs, models, schemas
+from ..admission import admit_write
+from ..auth import CurrentUser, get_current_user
+from ..database import get_db
+from . import import_routes, reviews  # noqa: F401  # register job handlers
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[schemas.Job])
+def list_jobs(
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """Return the current user's 20 most recent jobs."""
+    return (
+        db.query(models.Job)
+        .filter(models.Job.user_id == current_user.id)
+        .order_by(models.Job.created_at.desc())
+        .limit(20)
+        .all()
+    )
+
+
+def _get_owned_job(db: Session, job_id: str, user_id: str) -> models.Job:
+    job = (
+        db.query(models.Job)
+        .filter(models.Job.id == job_id, models.Job.user_id == user_id)
+        .first()
+    )
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    return job
+
+
+@router.get("/{job_id}", response_model=schemas.Job)
+def get_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """Return a job's status and progress."""
+    return _get_owned_job(db, job_id, current_user.id)
+
+
+@router.post("/{job_id}/resume", response_model=schemas.Job)
+def resume_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(admit_write),
+):
+    """
+    Re-schedule a job whose worker died (e.g. a frozen serverless instance).
+
+    A no-op unless the job is queued or running with a stale heartbeat, so it
+    is safe to call repeatedly; clients can call it when progress stalls.
+    """
+    job = _get_owned_job(db, job_id, current_user.id)
+    jobs.resume_if_stale(db, job)
+    return job
@@ -1,17 +1,77 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from .. import models, schemas
+from .. import cache, models, schemas
+from ..admission import admit_write
 from ..auth import CurrentUser, get_current_user
+from ..compression import cached_json_response
 from ..database import get_db
 
 router = APIRouter()
 
 
+PROBLEM_LIST = TypeAdapter(List[schemas.ProblemWithReview])
+
+
+def deck_fingerprint(db: Session, user_id: str) -> tuple:
+    """
+    Cheap summary of a user's deck state.
+
+    Part of the cache key for deck responses, so a write served by another
+    worker process (whose cache invalidation we never see) still changes it.
+    """
+    problems = (
+        db.query(func.count(models.Problem.id), func.max(models.Problem.updated_at))
+        .filter(models.Problem.user_id == user_id)
+        .one()
+    )
+    reviews = (
+        db.query(
+            func.count(models.ReviewMetadata.problem_id),
+            func.max(models.ReviewMetadata.last_reviewed),
+            func.sum(models.ReviewMetadata.total_reviews),
+        )
+        .join(models.Problem, models.Problem.id == models.ReviewMetadata.problem_id)
+        .filter(models.Problem.user_id == user_id)
+        .one()
+    )
+    return tuple(problems) + tuple(reviews)
+
+
+def deck_response(
+    request: Request,
+    db: Session,
+    user_id: str,
+    difficulty: Optional[str] = None,
+    tag: Optional[str] = None,
+    platform: Optional[str] = None,
+) -> Response:
+    """Serve a user's problems (with review metadata) from the compressed cache."""
+
+    def build() -> bytes:
+        query = db.query(models.Problem).filter(models.Problem.user_id == user_id)
+        if difficulty:
+            query = query.filter(models.Problem.difficulty == difficulty)
+        if platform:
+            query = query.filter(models.Problem.platform == platform)
+        if tag:
+            query = query.filter(models.Problem.tags.contains([tag]))
+        problems = query.order_by(models.Problem.id).all()
+        return PROBLEM_LIST.dump_json(
+            PROBLEM_LIST.validate_python(problems, from_attributes=True)
+        )
+
+    key = (difficulty, tag, platform, deck_fingerprint(db, user_id))
+    return cached_json_response(request, "problems", user_id, key, build)
+
+
 @router.get("/", response_model=List[schemas.ProblemWithReview])
 def list_problems(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_user),
     difficulty: Optional[str] = Query(None),
@@ -24,18 +84,7 @@ def list_problems(
     Note: Problems are automatically seeded for new users via database trigger
     when they sign up. No manual seeding is required.
     """
-    query = db.query(models.Problem).filter(
-        models.Problem.user_id == current_user.id
-    )
-
-    if difficulty:
-        query = query.filter(models.Problem.difficulty == difficulty)
-    if platform:
-        query = query.filter(models.Problem.platform == platform)
-    if tag:
-        query = query.filter(models.Problem.tags.contains([tag]))
-
-    return query.order_by(models.Problem.id).all()
+    return deck_response(request, db, current_user.id, difficulty, tag, platform)
 
 
 @router.get("/{problem_id}", response_model=schemas.ProblemWithReview)
@@ -61,11 +110,12 @@ def get_problem(
 def create_problem(
     payload: schemas.ProblemCreate,
     db: Session = Depends(get_db),
-    current_user: CurrentUser = Depends(get_current_user),
+    current_user: CurrentUser = Depends(admit_write),
 ):
     problem = models.Problem(**payload.model_dump(), user_id=current_user.id)
     db.add(problem)
     db.commit()
+    cache.invalidate_user(current_user.id)
     db.refresh(problem)
     return problem
 
@@ -75,7 +125,7 @@ def update_problem(
     problem_id: int,
     payload: schemas.ProblemUpdate,
     db: Session = Depends(get_db),
-    current_user: CurrentUser = Depends(get_current_user),
+    current_user: CurrentUser = Depends(admit_write),
 ):
     problem = (
         db.query(models.Problem)
@@ -92,6 +142,7 @@ def update_problem(
         setattr(problem, field, value)
 
     db.commit()
+    cache.invalidate_user(current_user.id)
     db.refresh(problem)
     return problem
 
@@ -100,7 +151,7 @@ def update_problem(
 def delete_problem(
     problem_id: int,
     db: Session = Depends(get_db),
-    current_user: CurrentUser = Depends(get_current_user),
+    current_user: CurrentUser = Depends(admit_write),
 ):
     problem = (
         db.query(models.Problem)
@@ -125,6 +176,7 @@ def delete_problem(
 
     db.delete(problem)
     db.commit()
+    cache.invalidate_user(current_user.id)
 
 
 @router.get("/tags", response_model=List[str])
@@ -1,16 +1,21 @@
 from datetime import datetime, timedelta
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from .. import models, schemas
+from .. import cache, jobs, models, schemas
+from ..analytics import compute_review_analytics
+from ..admission import admit_recompute, admit_write
 from ..auth import CurrentUser, get_current_user
 from ..database import get_db
+from .problems import deck_fingerprint, deck_response
 
 router = APIRouter()
 
 MAX_INTERVAL_DAYS = 30
+RECOMPUTE_BATCH_SIZE = 50
 
 
 def _get_or_create_metadata(db: Session, problem_id: int) -> models.ReviewMetadata:
@@ -26,25 +31,107 @@ def _get_or_create_metadata(db: Session, problem_id: int) -> models.ReviewMetada
     return metadata
 
 
+def _apply_review(
+    metadata: models.ReviewMetadata, result: str, reviewed_at: datetime
+) -> None:
+    """Update spaced repetition state for one review."""
+    if result == "remembered":
+        metadata.interval_days = min(
+            MAX_INTERVAL_DAYS, max(1, metadata.interval_days * 2)
+        )
+        metadata.times_remembered += 1
+    else:
+        metadata.interval_days = 1
+        metadata.times_forgot += 1
+
+    metadata.total_reviews += 1
+    metadata.last_reviewed = reviewed_at
+    metadata.next_review_due = reviewed_at + timedelta(days=metadata.interval_days)
+
+
+@jobs.handler("recompute_review_metadata")
+def run_recompute(ctx: jobs.JobContext) -> dict:
+    """
+    Rebuild review metadata and status flags by replaying review history.
+
+    Problems are processed in id order, a batch at a time; the cursor is the
+    last problem id whose metadata has been committed.
+    """
+    db, user_id = ctx.db, ctx.job.user_id
+    user_problems = db.query(models.Problem).filter(models.Problem.user_id == user_id)
+    total = user_problems.count()
+    done = user_problems.filter(models.Problem.id <= (ctx.cursor or 0)).count()
+
+    while True:
+        batch = (
+            user_problems.filter(models.Problem.id > (ctx.cursor or 0))
+            .order_by(models.Problem.id)
+            .limit(RECOMPUTE_BATCH_SIZE)
+            .all()
+        )
+        if not batch:
+            break
+        ids = [p.id for p in batch]
+
+        db.query(models.ReviewMetadata).filter(
+            models.ReviewMetadata.problem_id.in_(ids)
+        ).delete(synchronize_session=False)
+        history = (
+            db.query(models.ReviewHistory)
+            .filter(
+                models.ReviewHistory.user_id == user_id,
+                models.ReviewHistory.problem_id.in_(ids),
+            )
+            .order_by(models.ReviewHistory.reviewed_at, models.ReviewHistory.id)
+            .all()
+        )
+
+        metadata_by_problem: dict[int, models.ReviewMetadata] = {}
+        last_result: dict[int, str] = {}
+        for review in history:
+            metadata = metadata_by_problem.get(review.problem_id)
+            if metadata is None:
+                metadata = models.ReviewMetadata(
+                    problem_id=review.problem_id,
+                    total_reviews=0,
+                    times_remembered=0,
+                    times_forgot=0,
+                    interval_days=1,
+                )
+                metadata_by_problem[review.problem_id] = metadata
+                db.add(metadata)
+            _apply_review(metadata, review.result, review.reviewed_at)
+            last_result[review.problem_id] = review.result
+
+        for problem in batch:
+            result = last_result.get(problem.id)
+            if result is None:
+                problem.review_status = 0
+            else:
+                problem.review_status = 1 if result == "remembered" else -1
+
+        done += len(batch)
+        ctx.checkpoint(cursor=ids[-1], progress=done, total=total)
+
+    return {"problems": total}
+
+
 @router.get("/due", response_model=List[schemas.ProblemWithReview])
 def get_due_reviews(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_user),
 ):
     """Return all problems for the current user as reviewable cards."""
-    return (
-        db.query(models.Problem)
-        .filter(models.Problem.user_id == current_user.id)
-        .order_by(models.Problem.id.asc())
-        .all()
-    )
+    # Same body as an unfiltered problem list, so both share one cache entry.
+    return deck_response(request, db, current_user.id)
 
 
 @router.post("/", response_model=schemas.ReviewHistory)
 def create_review(
     payload: schemas.ReviewHistoryCreate,
     db: Session = Depends(get_db),
-    current_user: CurrentUser = Depends(get_current_user),
+    current_user: CurrentUser = Depends(admit_write),
 ):
     problem = (
         db.query(models.Problem)
@@ -60,19 +147,7 @@ def create_review(
     now = datetime.utcnow()
     metadata = _get_or_create_metadata(db, payload.problem_id)
 
-    # Update spaced repetition logic
-    if payload.result == "remembered":
-        metadata.interval_days = min(
-            MAX_INTERVAL_DAYS, max(1, metadata.interval_days * 2)
-        )
-        metadata.times_remembered += 1
-    else:
-        metadata.interval_days = 1
-        metadata.times_forgot += 1
-
-    metadata.total_reviews += 1
-    metadata.last_reviewed = now
-    metadata.next_review_due = now + timedelta(days=metadata.interval_days)
+    _apply_review(metadata, payload.result, now)
 
     # Persist simple status flag on the problem for quick lookup in the UI.
     problem.review_status = 1 if payload.result == "remembered" else -1
@@ -85,6 +160,7 @@ def create_review(
     )
     db.add(review)
     db.commit()
+    cache.invalidate_user(current_user.id)
     db.refresh(review)
     return review
 
@@ -144,32 +220,103 @@ def get_stats(
     )
 
 
-@router.put("/{problem_id}/reset")
-def reset_review(
-    problem_id: int,
+@router.get("/analytics", response_model=schemas.ReviewAnalytics)
+def get_analytics(
+    days: int = Query(365, ge=1, le=3650),
     db: Session = Depends(get_db),
     current_user: CurrentUser = Depends(get_current_user),
 ):
+    """
+    Per-tag, per-difficulty, per-day and per-interval review rollups.
+
+    Results are cached per user until the next write to their problems or
+    reviews. The key also carries a cheap fingerprint of the user's data, so
+    writes served by another worker process are picked up: the newest review
+    id catches new reviews, and the deck fingerprint catches edits, resets and
+    deletions. The current date rolls the daily window over even without writes.
+    """
+    last_review_id = (
+        db.query(func.max(models.ReviewHistory.id))
+        .filter(models.ReviewHistory.user_id == current_user.id)
+        .scalar()
+    )
+    key = (
+        days,
+        datetime.utcnow().date(),
+        last_review_id,
+        deck_fingerprint(db, current_user.id),
+    )
+    cached = cache.get_cached("analytics", current_user.id, key)
+    if cached is not None:
+        return cached
+
+    version = cache.user_version(current_user.id)
+    analytics = compute_review_analytics(db, current_user.id, days)
+    cache.set_cached("analytics", current_user.id, analytics, version, key=key)
+    return analytics
+
+
+@router.post("/recompute", response_model=schemas.Job, status_code=202)
+def recompute_reviews(
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(admit_recompute),
+):
+    """
+    Queue a rebuild of review metadata from the full review history.
+
+    Returns the already active recompute job if one is queued or running.
+    """
+    return jobs.submit(
+        db, current_user.id, "recompute_review_metadata", single_active=True
+    )
+
+
+def _reset_problems(db: Session, user_id: str, problem_ids: List[int]) -> int:
+    """Clear review history, metadata and status for the user's given problems."""
+    owned = [
+        problem_id
+        for (problem_id,) in db.query(models.Problem.id).filter(
+            models.Problem.id.in_(problem_ids),
+            models.Problem.user_id == user_id,
+        )
+    ]
+    if not owned:
+        return 0
+
     db.query(models.ReviewHistory).filter(
-        models.ReviewHistory.problem_id == problem_id,
-        models.ReviewHistory.user_id == current_user.id,
-    ).delete()
+        models.ReviewHistory.problem_id.in_(owned),
+        models.ReviewHistory.user_id == user_id,
+    ).delete(synchronize_session=False)
     db.query(models.ReviewMetadata).filter(
-        models.ReviewMetadata.problem_id == problem_id
-    ).delete()
+        models.ReviewMetadata.problem_id.in_(owned)
+    ).delete(synchronize_session=False)
 
-    # Also reset the simple status flag on the problem.
-    problem = (
-        db.query(models.Problem)
-        .filter(
-            models.Problem.id == problem_id,
-            models.Problem.user_id == current_user.id,
-        )
-        .first()
+    # Also reset the simple status flag on the problems.
+    db.query(models.Problem).filter(models.Problem.id.in_(owned)).update(
+        {models.Problem.review_status: 0}, synchronize_session=False
     )
-    if problem:
-        problem.review_status = 0
 
     db.commit()
-    return {"status": "ok"}
+    cache.invalidate_user(user_id)
+    return len(owned)
+
+
+@router.put("/reset")
+def reset_reviews(
+    payload: schemas.ReviewReset,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(admit_write),
+):
+    """Reset several problems (a day or the whole deck) as one write."""
+    reset = _reset_problems(db, current_user.id, payload.problem_ids)
+    return {"status": "ok", "reset": reset}
+
 
+@router.put("/{problem_id}/reset")
+def reset_review(
+    problem_id: int,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(admit_write),
+):
+    _reset_problems(db, current_user.id, [problem_id])
+    return {"status": "ok"}
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Literal, Optional
+from typing import Any, List, Literal, Optional
 
 from pydantic import BaseModel, field_validator
 
@@ -55,6 +55,10 @@ class ReviewHistoryCreate(ReviewHistoryBase):
     pass
 
 
+class ReviewReset(BaseModel):
+    problem_ids: List[int]
+
+
 class ReviewHistory(ReviewHistoryBase):
     id: int
     reviewed_at: datetime
@@ -87,3 +91,57 @@ class DashboardStats(BaseModel):
     success_rate: float
     streak_days: int
 
+
+
+class ResultRollup(BaseModel):
+    total_reviews: int
+    remembered: int
+    success_rate: float
+
+
+class TagRollup(ResultRollup):
+    tag: str
+
+
+class DifficultyRollup(ResultRollup):
+    difficulty: Optional[str] = None
+
+
+class DailyRollup(ResultRollup):
+    day: str  # ISO date (YYYY-MM-DD)
+
+
+class IntervalRollup(BaseModel):
+    interval_days: int
+    problems: int
+    total_reviews: int
+    times_remembered: int
+    success_rate: float
+
+
+class ReviewAnalytics(BaseModel):
+    by_tag: List[TagRollup]
+    by_difficulty: List[DifficultyRollup]
+    by_day: List[DailyRollup]
+    # Success rate bucketed by current spaced-repetition interval
+    # (an approximation of the forgetting curve).
+    by_interval: List[IntervalRollup]
+
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class Job(BaseModel):
+    id: str
+    kind: str
+    status: JobStatus
+    progress: int = 0
+    total: Optional[int] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,189 @@
+"""
+Cold-start benchmark: import time and time-to-first-response.
+
+Each sample runs in a fresh interpreter so nothing is warm. The child process
+imports `app.main`, runs the ASGI lifespan startup and then serves one
+request to `/health/live` and one to an API route, driving the app directly
+over ASGI (no server or HTTP client needed).
+
+Usage (from backend/):
+
+    python benchmarks/cold_start.py
+    python benchmarks/cold_start.py --mode fast --max-import-ms 400 --max-ttfr-ms 600
+
+In fast mode the script exits non-zero if any of `DEFERRED_MODULES` was
+loaded before the first API request; with --max-* thresholds it also fails
+when the median exceeds them. tests/test_cold_start.py runs the same check.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Modules FAST_COLD_START defers until the first API request (prefixes).
+DEFERRED_MODULES = ("app.routers", "app.models", "jose", "dotenv")
+
+CHILD = r"""
+import asyncio, json, os, sys, time
+
+t0 = time.perf_counter()
+from app.main import app
+t_import = time.perf_counter()
+
+
+async def lifespan_startup():
+    messages = [{"type": "lifespan.startup"}]
+    done = asyncio.Event()
+    # Never set: the app stays up for the requests below instead of running
+    # its shutdown handlers as soon as startup completes.
+    shutdown = asyncio.Event()
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await shutdown.wait()
+        return {"type": "lifespan.shutdown"}
+
+    async def send(message):
+        if message["type"].startswith("lifespan.startup"):
+            done.set()
+
+    task = asyncio.ensure_future(app({"type": "lifespan", "asgi": {"version": "3.0"}}, receive, send))
+    await done.wait()
+    return task
+
+
+async def get(path, token=None):
+    status = {}
+    headers = [(b"host", b"bench")]
+    if token:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "headers": headers,
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    await app(scope, receive, send)
+    return status.get("code")
+
+
+async def main():
+    lifespan = await lifespan_startup()  # keep a reference so it is not collected
+    t_startup = time.perf_counter()
+    health_status = await get("/health/live")
+    t_health = time.perf_counter()
+    preloaded = sorted(sys.modules)
+    # Without a token this stops at the auth dependency, but it still pays
+    # for loading the problems router.
+    api_status = await get("/api/problems/", os.environ.get("COLD_START_TOKEN"))
+    t_api = time.perf_counter()
+    print(json.dumps({
+        "import_ms": (t_import - t0) * 1000,
+        "startup_ms": (t_startup - t_import) * 1000,
+        "ttfr_health_ms": (t_health - t0) * 1000,
+        "ttfr_api_ms": (t_api - t0) * 1000,
+        "health_status": health_status,
+        "api_status": api_status,
+        "modules_loaded": len(sys.modules),
+        "preloaded_modules": preloaded,
+    }))
+
+
+asyncio.run(main())
+"""
+
+
+def run_sample(fast: bool, db_url: str, token: str | None = None) -> dict:
+    """Run one cold start in a fresh interpreter; `token` authenticates the API request."""
+    env = dict(os.environ)
+    env["DATABASE_URL"] = db_url
+    if token:
+        env["COLD_START_TOKEN"] = token
+    else:
+        env.pop("COLD_START_TOKEN", None)
+    env.pop("ENVIRONMENT", None)
+    if fast:
+        env["FAST_COLD_START"] = "1"
+    else:
+        env.pop("FAST_COLD_START", None)
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def deferred_modules_loaded(sample: dict) -> list[str]:
+    """`DEFERRED_MODULES` that were already loaded before the first API request."""
+    return [
+        name
+        for name in sample["preloaded_modules"]
+        if any(name == prefix or name.startswith(prefix + ".") for prefix in DEFERRED_MODULES)
+    ]
+
+
+def summarize(samples: list[dict]) -> dict:
+    keys = ("import_ms", "startup_ms", "ttfr_health_ms", "ttfr_api_ms", "modules_loaded")
+    return {key: statistics.median(s[key] for s in samples) for key in keys}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mode", choices=["fast", "standard", "both"], default="both")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    parser.add_argument("--max-ttfr-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    modes = ["standard", "fast"] if args.mode == "both" else [args.mode]
+    failed = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        for mode in modes:
+            samples = [run_sample(mode == "fast", db_url) for _ in range(args.runs)]
+            result = summarize(samples)
+            print(
+                f"{mode:>8}: import {result['import_ms']:.1f} ms, "
+                f"startup {result['startup_ms']:.1f} ms, "
+                f"first response {result['ttfr_health_ms']:.1f} ms, "
+                f"first API response {result['ttfr_api_ms']:.1f} ms, "
+                f"{result['modules_loaded']:.0f} modules (median of {args.runs})"
+            )
+            if mode != "fast":
+                continue
+            loaded = deferred_modules_loaded(samples[0])
+            if loaded:
+                print(f"FAIL: loaded before the first API request: {', '.join(loaded)}")
+                failed = True
+            if args.max_import_ms is not None and result["import_ms"] > args.max_import_ms:
+                print(f"FAIL: import {result['import_ms']:.1f} ms > {args.max_import_ms} ms")
+                failed = True
+            if args.max_ttfr_ms is not None and result["ttfr_api_ms"] > args.max_ttfr_ms:
+                print(f"FAIL: first API response {result['ttfr_api_ms']:.1f} ms > {args.max_ttfr_ms} ms")
+                failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
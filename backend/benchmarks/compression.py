@@ -0,0 +1,127 @@
+"""
+Compression benchmark: bytes on the wire and CPU cost per request.
+
+Builds a deck shaped like `GET /api/problems/` (every problem in
+`problems_list`, with code snippets and notes) and reports, per encoding:
+
+- the response size,
+- the CPU time to compress it per request (CompressionMiddleware levels),
+- the one-off CPU time to build the cached precompressed body, and
+- the CPU time to serve it from the cache on later requests.
+
+Usage (from backend/):
+
+    python benchmarks/compression.py [--runs 20]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from starlette.requests import Request  # noqa: E402
+
+from app import cache, compression  # noqa: E402
+
+SNIPPET = '''class Solution:
+    def solve(self, nums: List[int], target: int) -> int:
+        seen = {}
+        for i, n in enumerate(nums):
+            if target - n in seen:
+                return [seen[target - n], i]
+            seen[n] = i
+        return []
+'''
+
+
+def build_deck() -> bytes:
+    titles = [
+        line.strip()
+        for line in (BACKEND_DIR / "problems_list").read_text().splitlines()
+        if line.strip()
+    ]
+    deck = [
+        {
+            "id": i,
+            "title": title,
+            "url": f"https://leetcode.com/problems/{title.lower().replace(' ', '-')}/",
+            "difficulty": ("easy", "medium", "hard")[i % 3],
+            "platform": "leetcode",
+            "notes": f"Key idea for {title}: track state while scanning once. " * 4,
+            "algorithm_steps": "1. Initialise state\n2. Iterate\n3. Update answer\n",
+            "time_complexity": "O(n)",
+            "space_complexity": "O(n)",
+            "code_snippet": SNIPPET,
+            "tags": ["arrays", "hashing"],
+            "review_status": i % 3 - 1,
+            "created_at": "2026-01-01T00:00:00",
+            "updated_at": "2026-01-01T00:00:00",
+            "review_metadata": {
+                "problem_id": i,
+                "total_reviews": i % 7,
+                "times_remembered": i % 5,
+                "times_forgot": i % 2,
+                "last_reviewed": "2026-01-02T00:00:00",
+                "next_review_due": "2026-01-04T00:00:00",
+                "interval_days": 2,
+            },
+        }
+        for i, title in enumerate(titles, start=1)
+    ]
+    return json.dumps(deck).encode()
+
+
+def cpu_ms(fn, runs: int) -> float:
+    start = time.process_time()
+    for _ in range(runs):
+        fn()
+    return (time.process_time() - start) * 1000 / runs
+
+
+def request_for(encoding: str) -> Request:
+    headers = [(b"accept-encoding", encoding.encode())] if encoding else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    body = build_deck()
+    print(f"deck: {len(body) / 1024:.1f} KiB identity")
+    print(f"{'encoding':>8} {'bytes':>9} {'ratio':>6} {'per-request':>12} "
+          f"{'cache build':>12} {'cache hit':>10}")
+
+    for encoding in ("identity",) + compression.AVAILABLE_ENCODINGS:
+        if encoding == "identity":
+            size, dynamic = len(body), 0.0
+        else:
+            size = len(compression.compress(encoding, body))
+            dynamic = cpu_ms(lambda: compression.compress(encoding, body), args.runs)
+
+        accept = "" if encoding == "identity" else encoding
+        user = f"bench-{encoding}"
+        cache.invalidate_user(user)
+
+        def serve():
+            return compression.cached_json_response(
+                request_for(accept), "bench", user, None, lambda: body
+            )
+
+        build = cpu_ms(serve, 1)
+        hit = cpu_ms(serve, args.runs)
+        cached_size = len(serve().body)
+        print(
+            f"{encoding:>8} {cached_size:>9} {len(body) / cached_size:>6.1f} "
+            f"{dynamic:>10.2f}ms {build:>10.2f}ms {hit:>8.3f}ms"
+            + (f"  (per-request size {size})" if size != cached_size else "")
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
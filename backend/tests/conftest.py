@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Point the app at a throwaway SQLite database before `app` is imported.
+_tmp = tempfile.mkdtemp(prefix="algo-recall-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(_tmp) / 'test.db'}"
+os.environ.setdefault("SUPABASE_JWT_SECRET", "test-secret")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,134 @@
+import time
+import uuid
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app import admission, models
+from app.auth import CurrentUser, get_current_user
+from app.database import SessionLocal, bootstrap_schema, get_engine
+from app.routers import reviews
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = admission.FileBackend(str(tmp_path / "admission.json"))
+    admission.set_backend(backend)
+    yield backend
+    admission.set_backend(None)
+
+
+def make_client(monkeypatch, rate=0.0, burst=2, max_concurrent=1, user="u1"):
+    monkeypatch.setitem(
+        admission.POLICIES,
+        "test",
+        admission.AdmissionPolicy(rate=rate, burst=burst, max_concurrent=max_concurrent),
+    )
+    app = FastAPI()
+
+    @app.post("/write")
+    def write(current_user: CurrentUser = Depends(admission.admission("test"))):
+        return {"user": current_user.id}
+
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser(id=user)
+    return TestClient(app)
+
+
+def test_token_bucket_returns_429_with_retry_after(backend, monkeypatch):
+    client = make_client(monkeypatch, rate=0.5, burst=2)
+
+    assert client.post("/write").status_code == 200
+    assert client.post("/write").status_code == 200
+    response = client.post("/write")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+
+
+def test_buckets_are_per_user(backend, monkeypatch):
+    make_client(monkeypatch, burst=1, user="u1").post("/write")
+
+    assert make_client(monkeypatch, burst=1, user="u2").post("/write").status_code == 200
+    assert make_client(monkeypatch, burst=1, user="u1").post("/write").status_code == 429
+
+
+def test_concurrency_cap_returns_503_with_retry_after(backend, monkeypatch):
+    client = make_client(monkeypatch, burst=5, max_concurrent=1)
+    held = backend.acquire_slot("test", 1)
+
+    response = client.post("/write")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+    backend.release_slot("test", held)
+    assert client.post("/write").status_code == 200
+
+
+def test_shed_request_does_not_consume_token(backend, monkeypatch):
+    client = make_client(monkeypatch, burst=1, max_concurrent=1)
+    held = backend.acquire_slot("test", 1)
+
+    assert client.post("/write").status_code == 503
+
+    backend.release_slot("test", held)
+    assert client.post("/write").status_code == 200
+
+
+def test_slot_released_after_request(backend, monkeypatch):
+    client = make_client(monkeypatch, burst=5, max_concurrent=1)
+
+    for _ in range(3):
+        assert client.post("/write").status_code == 200
+
+    state = backend._update(lambda state: state)
+    assert state["slots"]["test"] == {}
+
+
+def test_refilled_buckets_are_pruned(backend):
+    backend.take_token("test:u1", rate=1000.0, burst=1)
+    assert "test:u1" in backend._update(lambda state: state)["buckets"]
+
+    # u1's bucket refills within a millisecond and is dropped on the next write.
+    backend.take_token("test:u2", rate=0.0, burst=1)
+    time.sleep(0.01)
+    backend.take_token("test:u2", rate=0.0, burst=1)
+    assert set(backend._update(lambda state: state)["buckets"]) == {"test:u2"}
+
+
+def test_local_backend_prunes_refilled_buckets(monkeypatch):
+    backend = admission.LocalBackend()
+    monkeypatch.setattr(admission.LocalBackend, "PRUNE_INTERVAL_SECONDS", 0.0)
+
+    backend.take_token("test:u1", rate=1000.0, burst=1)
+    time.sleep(0.01)
+    backend.take_token("test:u2", rate=1.0, burst=1)
+    assert set(backend._buckets) == {"test:u2"}
+
+
+def test_full_deck_reset_is_admitted(backend):
+    bootstrap_schema()
+    user_id = uuid.uuid4().hex
+    db = SessionLocal(bind=get_engine())
+    try:
+        deck = [
+            models.Problem(title=f"Problem {i}", review_status=1, user_id=user_id)
+            for i in range(150)
+        ]
+        db.add_all(deck)
+        db.commit()
+        problem_ids = [problem.id for problem in deck]
+
+        app = FastAPI()
+        app.include_router(reviews.router, prefix="/api/reviews")
+        app.dependency_overrides[get_current_user] = lambda: CurrentUser(id=user_id)
+        response = TestClient(app).put(
+            "/api/reviews/reset", json={"problem_ids": problem_ids}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["reset"] == 150
+        db.expire_all()
+        assert {problem.review_status for problem in deck} == {0}
+    finally:
+        db.close()
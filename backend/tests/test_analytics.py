@@ -0,0 +1,128 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import admission, models
+from app.auth import CurrentUser, get_current_user
+from app.database import SessionLocal, bootstrap_schema, get_engine
+from app.routers import reviews
+
+
+@pytest.fixture(scope="module", autouse=True)
+def schema():
+    bootstrap_schema()
+
+
+@pytest.fixture(autouse=True)
+def local_admission():
+    admission.set_backend(admission.LocalBackend())
+    yield
+    admission.set_backend(None)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal(bind=get_engine())
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def user_id():
+    return uuid.uuid4().hex
+
+
+@pytest.fixture
+def client(user_id):
+    app = FastAPI()
+    app.include_router(reviews.router, prefix="/api/reviews")
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser(id=user_id)
+    return TestClient(app)
+
+
+@pytest.fixture
+def deck(db, user_id):
+    """Two problems with a small review history over two days."""
+    two_sum = models.Problem(
+        title="Two Sum", difficulty="easy", tags=["array", "hash"], user_id=user_id
+    )
+    lru = models.Problem(
+        title="LRU Cache", difficulty="medium", tags=["hash"], user_id=user_id
+    )
+    db.add_all([two_sum, lru])
+    db.flush()
+
+    yesterday = datetime.utcnow() - timedelta(days=1)
+    today = datetime.utcnow()
+    for problem, result, reviewed_at in [
+        (two_sum, "remembered", yesterday),
+        (two_sum, "forgot", today),
+        (lru, "remembered", today),
+    ]:
+        db.add(
+            models.ReviewHistory(
+                problem_id=problem.id,
+                result=result,
+                reviewed_at=reviewed_at,
+                user_id=user_id,
+            )
+        )
+    db.commit()
+    return {"two_sum": two_sum.id, "lru": lru.id, "days": (yesterday, today)}
+
+
+def rollups(rows, key):
+    return {row[key]: (row["total_reviews"], row["remembered"]) for row in rows}
+
+
+def test_rollups_by_tag_difficulty_and_day(client, deck):
+    body = client.get("/api/reviews/analytics").json()
+
+    assert rollups(body["by_tag"], "tag") == {"hash": (3, 2), "array": (2, 1)}
+    assert body["by_tag"][0]["tag"] == "hash"
+    assert rollups(body["by_difficulty"], "difficulty") == {
+        "easy": (2, 1),
+        "medium": (1, 1),
+    }
+    yesterday, today = (day.date().isoformat() for day in deck["days"])
+    assert rollups(body["by_day"], "day") == {yesterday: (1, 1), today: (2, 1)}
+    assert [row["day"] for row in body["by_day"]] == [yesterday, today]
+
+
+def test_create_and_reset_change_next_read(client, deck):
+    assert rollups(client.get("/api/reviews/analytics").json()["by_tag"], "tag")[
+        "hash"
+    ] == (3, 2)
+
+    response = client.post(
+        "/api/reviews/", json={"problem_id": deck["lru"], "result": "forgot"}
+    )
+    assert response.status_code == 200
+    body = client.get("/api/reviews/analytics").json()
+    assert rollups(body["by_tag"], "tag")["hash"] == (4, 2)
+    assert rollups(body["by_difficulty"], "difficulty")["medium"] == (2, 1)
+
+    assert client.put(f"/api/reviews/{deck['two_sum']}/reset").status_code == 200
+    body = client.get("/api/reviews/analytics").json()
+    assert rollups(body["by_tag"], "tag") == {"hash": (2, 1)}
+    assert rollups(body["by_difficulty"], "difficulty") == {"medium": (2, 1)}
+
+
+def test_write_from_another_process_changes_next_read(client, db, deck, user_id):
+    assert rollups(
+        client.get("/api/reviews/analytics").json()["by_difficulty"], "difficulty"
+    )["easy"] == (2, 1)
+
+    # Written without cache.invalidate_user, as another worker process would.
+    db.add(
+        models.ReviewHistory(
+            problem_id=deck["two_sum"], result="remembered", user_id=user_id
+        )
+    )
+    db.commit()
+
+    body = client.get("/api/reviews/analytics").json()
+    assert rollups(body["by_difficulty"], "difficulty")["easy"] == (3, 2)
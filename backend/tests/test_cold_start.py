@@ -0,0 +1,30 @@
+import os
+import sys
+from pathlib import Path
+
+from jose import jwt
+from sqlalchemy import create_engine
+
+from app import models  # noqa: F401  # registers the tables on Base
+from app.database import Base
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+import cold_start  # noqa: E402
+
+
+def test_fast_cold_start_defers_imports_and_serves_lazy_routes(tmp_path):
+    # FAST_COLD_START runs no DDL, so the schema is bootstrapped out of band.
+    db_url = f"sqlite:///{tmp_path / 'cold.db'}"
+    Base.metadata.create_all(create_engine(db_url))
+    token = jwt.encode(
+        {"sub": "cold-start-user", "aud": "authenticated"},
+        os.environ["SUPABASE_JWT_SECRET"],
+        algorithm="HS256",
+    )
+
+    sample = cold_start.run_sample(fast=True, db_url=db_url, token=token)
+
+    assert cold_start.deferred_modules_loaded(sample) == []
+    assert sample["health_status"] == 200
+    # Served by the lazily mounted problems router.
+    assert sample["api_status"] == 200
@@ -0,0 +1,77 @@
+import gzip
+import threading
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app import compression
+
+PAYLOAD = {"items": ["x" * 40] * 100}
+
+
+def make_client():
+    app = FastAPI()
+    app.add_middleware(compression.CompressionMiddleware)
+
+    @app.get("/big")
+    def big():
+        return JSONResponse(PAYLOAD)
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def test_negotiate_prefers_client_quality_then_server_order():
+    assert compression.negotiate("") is None
+    assert compression.negotiate("identity") is None
+    assert compression.negotiate("*;q=0") is None
+    assert compression.negotiate("gzip") == "gzip"
+    assert compression.negotiate("gzip;q=0, *") != "gzip"
+
+
+def test_compresses_large_json_when_negotiated():
+    response = make_client().get("/big", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.json() == PAYLOAD
+
+
+def test_vary_header_without_negotiated_encoding():
+    client = make_client()
+    for accept in ("identity", "*;q=0"):
+        response = client.get("/big", headers={"Accept-Encoding": accept})
+        assert "content-encoding" not in response.headers
+        assert response.headers["Vary"] == "Accept-Encoding"
+
+
+def test_small_bodies_pass_through_with_vary():
+    response = make_client().get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["Vary"] == "Accept-Encoding"
+
+
+def test_cached_body_compresses_each_encoding_once(monkeypatch):
+    calls = []
+    real_compress = compression.compress
+
+    def counting_compress(encoding, data, level=None):
+        calls.append(encoding)
+        return real_compress(encoding, data, level)
+
+    monkeypatch.setattr(compression, "compress", counting_compress)
+    body = compression._CachedBody(b"{}" * 4096)
+
+    threads = [threading.Thread(target=body.get, args=("gzip",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["gzip"]
+    assert gzip.decompress(body.get("gzip")) == body.identity
@@ -0,0 +1,125 @@
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import database, health
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(health, "_startup", {"complete": False, "started_at": None})
+    monkeypatch.setattr(
+        health,
+        "_db_check",
+        {
+            "ok": None,
+            "error": None,
+            "checked_at": 0.0,
+            "latency_ms": None,
+            "started_at": None,
+        },
+    )
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(health.router)
+    return TestClient(app)
+
+
+def wait_for_check(timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while health._db_check["started_at"] is not None:
+        assert time.monotonic() < deadline, "DB check did not finish"
+        time.sleep(0.005)
+
+
+class BrokenEngine:
+    def connect(self):
+        raise RuntimeError("connection refused")
+
+
+class HangingEngine:
+    def __init__(self):
+        self.release = threading.Event()
+
+    def connect(self):
+        self.release.wait(5)
+        raise RuntimeError("timed out")
+
+
+def test_not_ready_before_startup(client):
+    response = client.get("/health/ready")
+
+    assert response.status_code == 503
+    assert response.json()["startup"]["complete"] is False
+
+
+def test_ready_after_successful_check(client):
+    health.mark_started()
+    wait_for_check()
+
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["database"] == "connected"
+    assert client.get("/health").status_code == 200
+
+
+def test_not_ready_when_check_fails(client, monkeypatch):
+    monkeypatch.setattr(health, "get_engine", BrokenEngine)
+    health.mark_started()
+    wait_for_check()
+
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["database"] == "disconnected"
+    assert "connection refused" in response.json()["error"]
+
+
+def test_spaced_probes_stay_ready(client, monkeypatch):
+    monkeypatch.setattr(health, "DB_CHECK_TTL_SECONDS", 0.01)
+    monkeypatch.setattr(health, "DB_CHECK_MAX_AGE_SECONDS", 0.03)
+    health.mark_started()
+    wait_for_check()
+
+    # Each probe reads a result older than the max age, left by the check the
+    # previous probe started; that alone must not make the instance unready.
+    for _ in range(3):
+        time.sleep(0.1)
+        assert client.get("/health/ready").status_code == 200
+        wait_for_check()
+
+
+def test_hung_check_reports_stale(client, monkeypatch):
+    monkeypatch.setattr(health, "DB_CHECK_TTL_SECONDS", 0.01)
+    monkeypatch.setattr(health, "DB_CHECK_MAX_AGE_SECONDS", 0.05)
+    health.mark_started()
+    wait_for_check()
+
+    engine = HangingEngine()
+    monkeypatch.setattr(health, "get_engine", lambda: engine)
+    time.sleep(0.02)
+    try:
+        # This probe starts the hanging check and still sees the last result.
+        assert client.get("/health/ready").status_code == 200
+        time.sleep(0.1)
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["database"] == "stale"
+    finally:
+        engine.release.set()
+        wait_for_check()
+
+
+def test_liveness_does_not_create_engine(client, monkeypatch):
+    monkeypatch.setattr(database, "_engine", None)
+
+    response = client.get("/health/live")
+
+    assert response.status_code == 200
+    assert response.json()["pool"] == {"created": False}
+    assert database.current_engine() is None
@@ -0,0 +1,181 @@
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import jobs, models
+from app.database import SessionLocal, bootstrap_schema, get_engine
+from app.routers import import_routes  # noqa: F401  # registers the import handler
+
+
+@pytest.fixture(scope="module", autouse=True)
+def schema():
+    bootstrap_schema()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal(bind=get_engine())
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def enqueued(monkeypatch):
+    """Capture scheduled job ids instead of running them on the executor."""
+    ids = []
+    monkeypatch.setattr(jobs, "enqueue", ids.append)
+    return ids
+
+
+@pytest.fixture
+def user_id():
+    return uuid.uuid4().hex
+
+
+def submit_import(db, user_id, count, **kwargs):
+    problems = [{"title": f"Problem {i}"} for i in range(count)]
+    return jobs.submit(
+        db,
+        user_id,
+        "import_neetcode150",
+        payload={"problems": problems},
+        total=count,
+        **kwargs,
+    )
+
+
+def titles(db, user_id):
+    return sorted(
+        title
+        for (title,) in db.query(models.Problem.title).filter(
+            models.Problem.user_id == user_id
+        )
+    )
+
+
+def make_stale(db, job_id, **fields):
+    db.query(models.Job).filter(models.Job.id == job_id).update(
+        {
+            models.Job.updated_at: datetime.utcnow()
+            - timedelta(seconds=jobs.JOB_STALE_SECONDS + 1),
+            **fields,
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+def test_import_job_runs_to_completion(db, enqueued, user_id):
+    job = submit_import(db, user_id, 30)
+    assert enqueued == [job.id]
+
+    jobs._run(job.id)
+
+    db.refresh(job)
+    assert job.status == "succeeded"
+    assert job.progress == 30
+    assert job.result == {"imported": 30}
+    assert len(titles(db, user_id)) == 30
+
+
+def test_idempotency_key_returns_existing_job(db, enqueued, user_id):
+    first = submit_import(db, user_id, 3, idempotency_key="abc")
+    second = submit_import(db, user_id, 3, idempotency_key="abc")
+
+    assert second.id == first.id
+    assert enqueued == [first.id]
+
+
+def test_single_active_returns_running_job(db, enqueued, user_id):
+    first = submit_import(db, user_id, 3, single_active=True)
+    second = submit_import(db, user_id, 3, single_active=True)
+
+    assert second.id == first.id
+
+
+def test_fresh_running_job_is_not_reclaimed(db, enqueued, user_id):
+    job = submit_import(db, user_id, 3)
+    assert jobs._claim(db, job.id) == 1
+    assert jobs._claim(db, job.id) is None
+
+
+def test_stale_job_resumes_from_cursor(db, enqueued, user_id):
+    job = submit_import(db, user_id, 30)
+    # Simulate a worker that committed the first batch and then died.
+    assert jobs._claim(db, job.id) == 1
+    for i in range(import_routes.IMPORT_BATCH_SIZE):
+        db.add(models.Problem(title=f"Problem {i}", user_id=user_id))
+    make_stale(db, job.id, cursor=import_routes.IMPORT_BATCH_SIZE)
+    enqueued.clear()
+
+    jobs.resume_stale_jobs()
+    assert job.id in enqueued
+    jobs._run(job.id)
+
+    db.refresh(job)
+    assert job.status == "succeeded"
+    assert job.attempts == 2
+    assert titles(db, user_id) == sorted(f"Problem {i}" for i in range(30))
+
+
+def test_sweeper_resumes_job_once_heartbeat_goes_stale(db, enqueued, user_id, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_STALE_SECONDS", 0.2)
+    job = submit_import(db, user_id, 3)
+    # Running with a fresh heartbeat, as after a quick restart.
+    jobs._claim(db, job.id)
+    enqueued.clear()
+
+    jobs.resume_stale_jobs()
+    assert job.id not in enqueued
+
+    jobs.start_sweeper()
+    try:
+        deadline = time.monotonic() + 5
+        while job.id not in enqueued:
+            assert time.monotonic() < deadline, "stale job was not resumed"
+            time.sleep(0.02)
+    finally:
+        jobs.shutdown()
+
+
+def test_reclaimed_runner_aborts_without_duplicates(db, enqueued, user_id):
+    job = submit_import(db, user_id, 30)
+    first_attempt = jobs._claim(db, job.id)
+
+    # The first runner stalls long enough for its job to be reclaimed...
+    make_stale(db, job.id)
+    second_attempt = jobs._claim(db, job.id)
+    assert second_attempt == first_attempt + 1
+
+    # ...so its next checkpoint is fenced off and its batch rolled back.
+    stalled = SessionLocal(bind=get_engine())
+    try:
+        ctx = jobs.JobContext(stalled, stalled.get(models.Job, job.id), first_attempt)
+        with pytest.raises(jobs.JobLost):
+            import_routes.run_import(ctx)
+    finally:
+        stalled.close()
+    assert titles(db, user_id) == []
+
+    # The current attempt imports everything exactly once.
+    current = SessionLocal(bind=get_engine())
+    try:
+        ctx = jobs.JobContext(current, current.get(models.Job, job.id), second_attempt)
+        import_routes.run_import(ctx)
+    finally:
+        current.close()
+    assert len(titles(db, user_id)) == 30
+
+
+def test_resume_fails_job_after_max_attempts(db, enqueued, user_id):
+    job = submit_import(db, user_id, 3)
+    jobs._claim(db, job.id)
+    make_stale(db, job.id, attempts=jobs.MAX_ATTEMPTS)
+    enqueued.clear()
+
+    jobs.resume_if_stale(db, job)
+
+    assert enqueued == []
+    assert job.status == "failed"
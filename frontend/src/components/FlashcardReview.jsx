@@ -119,9 +119,9 @@ export default function FlashcardReview() {
 
   const handleResetAllConfirm = async () => {
     try {
-      await Promise.all(
-        problems.map((p) => api.put(`/reviews/${p.id}/reset`))
-      );
+      await api.put("/reviews/reset", {
+        problem_ids: problems.map((p) => p.id),
+      });
       setStatusById({});
       setSelectedId(null);
       setResetAllDialogOpen(false);
@@ -156,9 +156,9 @@ export default function FlashcardReview() {
     if (!dayToReset) return;
 
     try {
-      await Promise.all(
-        dayToReset.map((p) => api.put(`/reviews/${p.id}/reset`))
-      );
+      await api.put("/reviews/reset", {
+        problem_ids: dayToReset.map((p) => p.id),
+      });
       setStatusById((prev) => {
         const next = { ...prev };
         for (const p of dayToReset) {